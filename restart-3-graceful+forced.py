@@ -1,10 +1,8 @@
 import os
 import signal
-import subprocess
-import time
-import schedule
 import logging
 import psutil
+from apscheduler.schedulers.blocking import BlockingScheduler
 
 # Configure logging
 logging.basicConfig(
@@ -13,14 +11,32 @@ logging.basicConfig(
 )
 logger = logging.getLogger("fastapi-restarter")
 
+# PID file written by the FastAPI app on startup
+PID_FILE = "/run/fastapi.pid"
+
+# Where the FastAPI application's stdout/stderr are written
+UVICORN_LOG = os.environ.get("UVICORN_LOG", "/var/log/uvicorn.log")
+
 def find_fastapi_pid():
     """Find the PID of the FastAPI/Uvicorn process"""
-    for proc in psutil.process_iter(['pid', 'name', 'cmdline']):
+    # Prefer the PID file written by the app at startup, but make sure the
+    # PID hasn't been reused by an unrelated process
+    try:
+        with open(PID_FILE) as f:
+            pid = int(f.read())
+        if 'uvicorn' in ' '.join(psutil.Process(pid).cmdline()):
+            logger.info(f"Found FastAPI/Uvicorn process from {PID_FILE}: {pid}")
+            return pid
+    except (OSError, ValueError, psutil.Error):
+        pass
+    
+    # Fall back to scanning the process table
+    for proc in psutil.process_iter(['pid', 'cmdline']):
         try:
             # Look for uvicorn process running FastAPI
             if proc.info['cmdline'] and 'uvicorn' in ' '.join(proc.info['cmdline']):
                 # You can make this more specific by checking for your app name
-                # e.g., if 'main:app' in ' '.join(proc.info['cmdline']):
+                # e.g., if 'restart:app' in ' '.join(proc.info['cmdline']):
                 logger.info(f"Found FastAPI/Uvicorn process: {proc.info['pid']}")
                 return proc.info['pid']
         except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
@@ -34,21 +50,27 @@ def restart_fastapi():
     if pid:
         logger.info(f"Restarting FastAPI application with PID {pid}")
         try:
+            proc = psutil.Process(pid)
+            
             # Send SIGTERM signal to gracefully terminate the process
             os.kill(pid, signal.SIGTERM)
             logger.info("SIGTERM signal sent successfully")
             
-            # Wait for the process to terminate
-            time.sleep(5)
+            # Wait for the process to terminate; returns as soon as it exits.
+            # Allow a margin past Uvicorn's own deadline so it can cancel and
+            # exit on its own before we resort to SIGKILL
+            gone, alive = psutil.wait_procs([proc], timeout=GRACEFUL_SHUTDOWN_SECONDS + SIGKILL_MARGIN_SECONDS)
             
             # Check if process is still running
-            if psutil.pid_exists(pid):
+            if alive:
                 logger.warning(f"Process {pid} still running after SIGTERM, sending SIGKILL")
                 os.kill(pid, signal.SIGKILL)
+                # Make sure it has exited so the new instance can bind the port
+                psutil.wait_procs(alive, timeout=5)
             
             # Start the FastAPI app again
             start_fastapi()
-        except ProcessLookupError:
+        except (ProcessLookupError, psutil.NoSuchProcess):
             logger.error(f"Process with PID {pid} not found")
         except Exception as e:
             logger.error(f"Error during restart: {str(e)}")
@@ -56,35 +78,58 @@ def restart_fastapi():
         logger.warning("No FastAPI process found to restart, starting a new instance")
         start_fastapi()
 
+# Uvicorn's graceful shutdown bound, and how much longer we wait before SIGKILL
+GRACEFUL_SHUTDOWN_SECONDS = 30
+SIGKILL_MARGIN_SECONDS = 5
+
 def start_fastapi():
     """Start the FastAPI application"""
     try:
         logger.info("Starting FastAPI application")
+        
+        # Open the log here so a missing directory or permission problem
+        # can't stop the child from starting (e.g. when not running as root)
+        try:
+            log_fd = os.open(UVICORN_LOG, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        except OSError as e:
+            logger.warning(f"Could not open {UVICORN_LOG}, discarding FastAPI output: {e}")
+            log_fd = os.open(os.devnull, os.O_WRONLY)
+        
         # Adjust the command based on your specific app configuration
-        # This example assumes you're running 'uvicorn main:app --host 0.0.0.0 --port 8000'
-        subprocess.Popen(
-            ["uvicorn", "main:app", "--host", "0.0.0.0", "--port", "8000"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            start_new_session=True  # Detach the process
-        )
-        logger.info("FastAPI application started")
+        # This example runs restart.py's app with in-process restarts disabled
+        # posix_spawn avoids copying our page tables as fork() would, and
+        # the output goes to a log file rather than pipes nobody drains
+        try:
+            pid = os.posix_spawnp(
+                "uvicorn",
+                ["uvicorn", "restart:app", "--host", "0.0.0.0", "--port", "8000",
+                 "--timeout-graceful-shutdown", str(GRACEFUL_SHUTDOWN_SECONDS)],
+                {**os.environ, "RESTART_STRATEGY": "external"},
+                file_actions=[
+                    (os.POSIX_SPAWN_OPEN, 0, os.devnull, os.O_RDONLY, 0),
+                    (os.POSIX_SPAWN_DUP2, log_fd, 1),
+                    (os.POSIX_SPAWN_DUP2, log_fd, 2),
+                ],
+                setsid=True  # Detach the process
+            )
+        finally:
+            os.close(log_fd)
+        logger.info(f"FastAPI application started with PID {pid}")
     except Exception as e:
         logger.error(f"Error starting FastAPI application: {str(e)}")
 
 def schedule_restarts(interval_hours=6):
     """Schedule periodic restarts at specified interval"""
-    schedule.every(interval_hours).hours.do(restart_fastapi)
+    sched = BlockingScheduler(timezone='Europe/London')
+    sched.add_job(restart_fastapi, 'interval', hours=interval_hours)
     logger.info(f"Scheduled FastAPI restarts every {interval_hours} hours")
     
     # Check if FastAPI is running, start if not
     if not find_fastapi_pid():
         start_fastapi()
     
-    # Keep the scheduler running
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute for scheduled tasks
+    # Block until the next scheduled job is due
+    sched.start()
 
 if __name__ == "__main__":
     # Schedule restarts every 6 hours
@@ -0,0 +1,367 @@
+import os
+import signal
+import threading
+import time
+import logging
+from datetime import datetime, timedelta, time as dtime
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+import orjson
+import uvicorn
+from fastapi import FastAPI, BackgroundTasks, Response
+from fastapi.concurrency import run_in_threadpool
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.executors.pool import ThreadPoolExecutor
+from apscheduler.jobstores.base import JobLookupError
+from apscheduler.events import (
+    EVENT_JOB_ADDED, EVENT_JOB_MODIFIED, EVENT_JOB_EXECUTED, EVENT_JOB_REMOVED,
+    EVENT_JOB_MISSED, EVENT_JOB_ERROR
+)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("fastapi-app")
+
+# Restart strategies accepted by make_app:
+#   apscheduler - restart daily at 11:30 PM BST using APScheduler
+#   thread      - restart every N hours (6 by default) from a background thread
+#   external    - no in-process schedule; restart-3-graceful+forced.py restarts us
+STRATEGIES = ('apscheduler', 'thread', 'external')
+
+# PID file read by the external restarter (restart-3-graceful+forced.py)
+PID_FILE = "/run/fastapi.pid"
+
+# Look the process ID up once rather than per request. It is refreshed after
+# a fork, since the module may be imported before forking workers
+# (e.g. gunicorn --preload) and those must not report or signal the parent
+PID = os.getpid()
+
+def _refresh_pid():
+    global PID
+    PID = os.getpid()
+
+os.register_at_fork(after_in_child=_refresh_pid)
+
+# Timezone used for all restart scheduling
+LONDON_TZ = ZoneInfo('Europe/London')
+
+# 503 response sent to every request while a restart is in progress,
+# encoded once so blocked requests don't allocate anything
+_MAINT_BODY = b'{"message":"Server unavailable due to scheduled activity. Please try again later."}'
+_MAINT_RESPONSE_HEADERS = [
+    (b'content-type', b'application/json'),
+    (b'content-length', str(len(_MAINT_BODY)).encode()),
+]
+_MAINT_RESPONSE_START = {'type': 'http.response.start', 'status': 503, 'headers': _MAINT_RESPONSE_HEADERS}
+_MAINT_RESPONSE_BODY = {'type': 'http.response.body', 'body': _MAINT_BODY}
+
+default_restart_time = dtime(23, 30)  # Default restart time at 11:30 PM BST
+
+def install_sigterm_handler(restart_in_progress):
+    """Flip the 503 gate on SIGTERM before handing over to Uvicorn's handler"""
+    previous = signal.getsignal(signal.SIGTERM)
+
+    def on_sigterm(signum, frame):
+        # Event.set() takes a lock; nothing else sets the gate on the main
+        # thread, and skipping it when already closed avoids a second SIGTERM
+        # re-entering it from inside this handler
+        if not restart_in_progress.is_set():
+            restart_in_progress.set()
+        if callable(previous):
+            previous(signum, frame)
+        elif previous == signal.SIG_DFL:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.raise_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+def _apscheduler_strategy(perform_restart):
+    """Restart daily at the default time using APScheduler"""
+    interval_hours = None  # None means daily at default_restart_time
+    next_run_time = None  # Kept in sync with the restart job by update_next_run
+    next_run_ns = None  # The same instant on the monotonic clock
+
+    job_id = 'restart_job'
+
+    # The restart job only signals the process, so a single worker is enough;
+    # max_instances=1 keeps two restart jobs from overlapping
+    scheduler = BackgroundScheduler(
+        timezone=LONDON_TZ,
+        executors={'default': ThreadPoolExecutor(max_workers=1)},
+        job_defaults={'max_instances': 1, 'coalesce': True, 'misfire_grace_time': 300}
+    )
+
+    def update_next_run(event):
+        """Cache the restart job's next run time whenever the job changes"""
+        nonlocal next_run_time, next_run_ns
+        job = scheduler.get_job(event.job_id)
+        next_run_time = job.next_run_time if job else None
+        if next_run_time:
+            # Compare POSIX timestamps: subtracting two datetimes with the same
+            # ZoneInfo ignores a DST offset change between them
+            delay = next_run_time.timestamp() - time.time()
+            next_run_ns = time.monotonic_ns() + int(delay * 1e9)
+        else:
+            next_run_ns = None
+
+    # Missed and failed runs also move next_run_time forward, but only send
+    # EVENT_JOB_MISSED / EVENT_JOB_ERROR
+    scheduler.add_listener(
+        update_next_run,
+        EVENT_JOB_ADDED | EVENT_JOB_MODIFIED | EVENT_JOB_EXECUTED | EVENT_JOB_REMOVED
+        | EVENT_JOB_MISSED | EVENT_JOB_ERROR
+    )
+
+    def schedule_restart():
+        """Schedule the restart at the default time (11:30 PM BST)"""
+        now = datetime.now(LONDON_TZ)
+        next_restart = now.replace(hour=default_restart_time.hour, minute=default_restart_time.minute, second=0, microsecond=0)
+        if now >= next_restart:
+            next_restart += timedelta(days=1)
+        scheduler.add_job(perform_restart, 'date', run_date=next_restart, id=job_id)
+        logger.info(f"Next restart scheduled at {next_restart.isoformat()}")
+
+    def start():
+        logger.info(f"Configured to restart at 11:30 PM BST daily")
+        scheduler.start()
+        schedule_restart()
+
+    def stop():
+        scheduler.shutdown()
+
+    def configure(hours):
+        nonlocal interval_hours
+        interval_hours = hours
+        # Reschedule the restart job with new interval
+        try:
+            scheduler.reschedule_job(job_id, trigger='interval', hours=interval_hours)
+        except JobLookupError:
+            # The one-off daily job has already run
+            scheduler.add_job(perform_restart, 'interval', hours=interval_hours, id=job_id)
+
+    def status_fields(now_ns):
+        # Same fields restart-1.py reported: restart_interval_hours is the
+        # time left until the next restart, in hours
+        return {
+            "next_restart": next_run_time,
+            "restart_interval_hours": (next_run_ns - now_ns) / 3.6e12 if next_run_ns else None
+        }
+
+    return SimpleNamespace(start=start, stop=stop, next_restart=lambda: next_run_time,
+                           status_fields=status_fields, configure=configure)
+
+def _thread_strategy(perform_restart):
+    """Restart every interval_hours from a background thread"""
+    interval_hours = 6  # Default restart interval
+    should_restart = True
+    wake = threading.Event()  # Set to cut the current wait short
+    deadline = None  # Epoch timestamp the current wait ends
+    deadline_ns = None  # The same instant on the monotonic clock
+
+    def scheduled_restart_task():
+        """Background thread that handles the scheduled restarts"""
+        nonlocal deadline, deadline_ns
+        while should_restart:
+            deadline_ns = time.monotonic_ns() + interval_hours * 3600 * 10**9
+            deadline = time.time() + interval_hours * 3600
+            # Sleep for the configured interval unless woken early
+            if wake.wait(timeout=interval_hours * 3600):  # Convert hours to seconds
+                wake.clear()
+                continue  # Interval changed or shutting down
+
+            perform_restart()
+            break  # Exit the thread as we're restarting
+
+    def start():
+        logger.info(f"Configured to restart every {interval_hours} hours")
+        restart_thread = threading.Thread(target=scheduled_restart_task)
+        restart_thread.daemon = True  # Make thread exit when main thread exits
+        restart_thread.start()
+
+    def stop():
+        nonlocal should_restart
+        should_restart = False
+        wake.set()
+
+    def configure(hours):
+        nonlocal interval_hours
+        interval_hours = hours
+        # Wake the scheduler thread so it waits again with the new interval
+        wake.set()
+
+    def status_fields(now_ns):
+        # Same fields restart-2.py reported: restart_interval_hours is the
+        # configured interval
+        return {
+            "next_restart_in_seconds": max(0, (deadline_ns - now_ns) / 1e9) if deadline_ns else None,
+            "restart_interval_hours": interval_hours
+        }
+
+    # next_restart is an epoch timestamp, as restart-2.py reported it
+    return SimpleNamespace(start=start, stop=stop, next_restart=lambda: deadline,
+                           status_fields=status_fields, configure=configure)
+
+def _external_strategy():
+    """Leave restarts to the external restarter process"""
+    def start():
+        logger.info("Restarts are managed by the external restarter")
+
+    return SimpleNamespace(start=start, stop=lambda: None, next_restart=lambda: None,
+                           status_fields=lambda now_ns: {"next_restart": None}, configure=None)
+
+def make_app(strategy='apscheduler'):
+    """Create the ASGI app using one of the restart STRATEGIES"""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown restart strategy {strategy!r}, expected one of {STRATEGIES}")
+
+    # Restart state is per app, so several apps in one process don't interfere
+    last_restart_time = datetime.now(LONDON_TZ)
+    last_restart_ns = time.monotonic_ns()
+    restart_in_progress = threading.Event()
+
+    def perform_restart():
+        """Function to perform the restart"""
+        nonlocal last_restart_time, last_restart_ns
+
+        # Log restart information
+        logger.info(f"Performing scheduled restart of process {PID}")
+        last_restart_time = datetime.now(LONDON_TZ)
+        last_restart_ns = time.monotonic_ns()
+
+        # Indicate that restart is in progress
+        restart_in_progress.set()
+
+        # Send SIGTERM to the current process; Uvicorn bounds the graceful
+        # shutdown itself (see timeout_graceful_shutdown below)
+        os.kill(PID, signal.SIGTERM)
+
+    if strategy == 'apscheduler':
+        restarter = _apscheduler_strategy(perform_restart)
+    elif strategy == 'thread':
+        restarter = _thread_strategy(perform_restart)
+    else:
+        restarter = _external_strategy()
+
+    # Create FastAPI app
+    app = FastAPI(title="Auto-Restarting FastAPI App")
+
+    @app.on_event("startup")
+    async def startup_event():
+        """Start the restart scheduler when the app starts"""
+        logger.info(f"Application started with PID: {PID}")
+
+        # Record the PID so the restarter doesn't have to scan every process;
+        # it falls back to scanning if we can't write the file (e.g. not root)
+        try:
+            with open(PID_FILE, "w") as f:
+                f.write(str(PID))
+        except OSError as e:
+            logger.warning(f"Could not write PID file {PID_FILE}: {e}")
+
+        # Uvicorn has installed its own handlers by now, so ours chains to them.
+        # Signal handlers can only be set from the main thread, which isn't
+        # where startup runs under TestClient or a threaded uvicorn.run
+        if threading.current_thread() is threading.main_thread():
+            install_sigterm_handler(restart_in_progress)
+
+        restarter.start()
+        logger.info("Automatic restart scheduler started")
+
+    @app.on_event("shutdown")
+    async def shutdown_event():
+        """Handle clean shutdown"""
+        restarter.stop()
+
+        # Remove the PID file so a later process reusing our PID isn't mistaken for us
+        try:
+            with open(PID_FILE) as f:
+                if f.read() == str(PID):
+                    os.unlink(PID_FILE)
+        except OSError:
+            pass
+        logger.info("Application shutting down")
+
+    @app.get("/")
+    async def root():
+        """Basic root endpoint"""
+        # Encoded with orjson, which handles the datetimes natively, and
+        # returned directly so the dict skips jsonable_encoder
+        return Response(orjson.dumps({
+            "message": "FastAPI server running with auto-restart feature",
+            "process_id": PID,
+            "last_restart": last_restart_time,
+            "next_restart": restarter.next_restart()
+        }), media_type="application/json")
+
+    @app.get("/status")
+    async def status():
+        """Report app status with restart information"""
+        # Both durations come from the monotonic clock, so they are immune
+        # to NTP adjustments and DST changes
+        now_ns = time.monotonic_ns()
+
+        return Response(orjson.dumps({
+            "status": "running",
+            "process_id": PID,
+            "uptime_seconds": (now_ns - last_restart_ns) / 1e9,
+            "last_restart": last_restart_time,
+            **restarter.status_fields(now_ns)
+        }), media_type="application/json")
+
+    @app.post("/admin/restart")
+    async def manual_restart(background_tasks: BackgroundTasks):
+        """Endpoint to manually trigger a restart"""
+        logger.info(f"Manual restart triggered for process {PID}")
+
+        # Indicate that restart is in progress. Set from a worker thread so
+        # the SIGTERM handler, which runs on the main thread, can never
+        # interrupt this set() while it holds the Event's lock
+        await run_in_threadpool(restart_in_progress.set)
+
+        # Schedule the restart with a small delay to allow the response to be sent
+        def delayed_restart():
+            time.sleep(1)  # 1-second delay
+            os.kill(PID, signal.SIGTERM)
+
+        background_tasks.add_task(delayed_restart)
+        return {"message": "Application restarting...", "process_id": PID}
+
+    if restarter.configure:
+        @app.post("/admin/configure")
+        async def configure_restart(interval_hours: int):
+            """Configure the restart interval"""
+            if interval_hours < 1:
+                return {"error": "Interval must be at least 1 hour"}
+
+            # Update the configuration
+            restarter.configure(interval_hours)
+
+            return {
+                "message": f"Restart interval configured to {interval_hours} hours",
+                "next_restart_in_seconds": interval_hours * 3600
+            }
+
+    async def check_restart_status(scope, receive, send):
+        """ASGI wrapper to handle requests during restart"""
+        if restart_in_progress.is_set() and scope["type"] == "http":
+            await send(_MAINT_RESPONSE_START)
+            await send(_MAINT_RESPONSE_BODY)
+            return
+        await app(scope, receive, send)
+
+    # Wrap the app directly rather than adding HTTP middleware so the common
+    # path is a single Event check instead of a middleware call stack
+    return check_restart_status
+
+# Strategy is chosen at startup so `uvicorn restart:app` works unchanged.
+# Nothing else bounds shutdown, so CLI launches must pass the same limit as
+# below: uvicorn restart:app --timeout-graceful-shutdown 30
+app = make_app(os.environ.get("RESTART_STRATEGY", "apscheduler"))
+
+if __name__ == "__main__":
+    # When running this file directly, start the Uvicorn server
+    logger.info(f"Starting FastAPI application with the {os.environ.get('RESTART_STRATEGY', 'apscheduler')} restart strategy")
+    uvicorn.run("restart:app", host="0.0.0.0", port=8000, reload=False, timeout_graceful_shutdown=30)